@@ -14,5 +14,7 @@ os.environ['OPENAI_BASE_URL'] = os.environ.get('OPENAI_BASE_URL', 'https://model
 app = create_app()
 
 if __name__ == "__main__":
+    # Development server only; use gunicorn (see gunicorn.conf.py) in production
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    debug = os.environ.get("FLASK_ENV") == "development"
+    app.run(host="0.0.0.0", port=port, debug=debug, threaded=True)
@@ -1,13 +1,36 @@
 import os
+import logging
 from flask import Flask
 from flask_wtf.csrf import CSRFProtect
+from app.utils.json_provider import OrjsonProvider
 
 csrf = CSRFProtect()
 
+# Environment variables the API wrappers need; checked once at startup
+REQUIRED_ENV_VARS = ('FMP_API_KEY', 'GITHUB_TOKEN')
+
+def _check_config(app):
+    """Fail fast on missing API credentials instead of checking them on every request."""
+    missing = [name for name in REQUIRED_ENV_VARS if not os.environ.get(name)]
+    if missing:
+        raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
+    
+    from app.utils.openai_insights import get_api_key_type
+    app.logger.info("AI API key type: %s", get_api_key_type(os.environ['GITHUB_TOKEN']))
+
 def create_app():
     """Initialize the Flask application."""
+    # Quiet by default in production; set LOG_LEVEL=INFO or DEBUG for request-level logs
+    logging.basicConfig(
+        level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
+        format='%(asctime)s %(levelname)s %(name)s %(message)s'
+    )
+    
     app = Flask(__name__)
     app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'dev-key-for-testing')
+    app.json = OrjsonProvider(app)
+    
+    _check_config(app)
     
     csrf.init_app(app)
     
@@ -19,4 +42,8 @@ def create_app():
     app.register_blueprint(search_bp)
     app.register_blueprint(financial_bp)
     
+    # The financial blueprint is a JSON API for non-browser clients; the search
+    # blueprint is posted to by the HTML UI and keeps CSRF protection
+    csrf.exempt(financial_bp)
+    
     return app
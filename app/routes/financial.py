@@ -1,5 +1,7 @@
 import logging
-from flask import Blueprint, request, jsonify, current_app
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from app.utils.financial_api import (
     search_company_by_name,
     get_company_profile,
@@ -13,6 +15,29 @@ from app.utils.financial_api import (
 financial_bp = Blueprint('financial', __name__, url_prefix='/financial')
 logger = logging.getLogger(__name__)
 
+# Sections that can be requested through the batch endpoint
+BATCH_SECTIONS = {
+    'profile': get_company_profile,
+    'ratios': get_financial_ratios,
+    'income': get_income_statement,
+    'balance': get_balance_sheet
+}
+# Upper bound on tickers x sections per batch request
+MAX_BATCH_ITEMS = 100
+
+# Queries that look like a ticker symbol are resolved through the (cached) profile endpoint
+TICKER_RE = re.compile(r'[A-Z]{1,5}')
+
+def _profile_as_search_result(profile):
+    """Shape a company profile like an entry from the FMP search endpoint."""
+    return {
+        'symbol': profile.get('symbol'),
+        'name': profile.get('companyName'),
+        'currency': profile.get('currency'),
+        'stockExchange': profile.get('exchange'),
+        'exchangeShortName': profile.get('exchangeShortName')
+    }
+
 @financial_bp.route('/search', methods=['GET', 'POST'])
 def search_company():
     """
@@ -25,13 +50,20 @@ def search_company():
         if not company_name:
             company_name = request.form.get('company_name', '')
             
-        logger.info(f"Financial search request received for company: '{company_name}'")
+        logger.info("Financial search request received for company: '%s'", company_name)
         
         if not company_name:
             logger.warning("Empty company name provided")
             return jsonify({'success': False, 'error': 'Please provide a company name'})
         
         try:
+            # A typed ticker ("AAPL") maps straight to one company
+            if TICKER_RE.fullmatch(company_name):
+                profile = get_company_profile(company_name)
+                if "error" not in profile:
+                    logger.info("Resolved '%s' as a ticker symbol", company_name)
+                    return jsonify({'success': True, 'companies': [_profile_as_search_result(profile)]})
+            
             # Search for the company
             companies = search_company_by_name(company_name)
             
@@ -39,14 +71,14 @@ def search_company():
                 return jsonify({'success': False, 'error': companies["error"]})
                 
             if not companies:
-                logger.info(f"No companies found for '{company_name}'")
+                logger.info("No companies found for '%s'", company_name)
                 return jsonify({'success': True, 'companies': []})
             
-            logger.info(f"Found {len(companies)} companies matching '{company_name}'")
+            logger.info("Found %s companies matching '%s'", len(companies), company_name)
             return jsonify({'success': True, 'companies': companies})
             
         except Exception as e:
-            logger.error(f"Error in company search: {str(e)}")
+            logger.error("Error in company search: %s", e)
             return jsonify({'success': False, 'error': str(e)})
     
     # GET request - render search form
@@ -57,7 +89,7 @@ def company_financial_data(ticker):
     """
     Get financial data for a company by ticker symbol
     """
-    logger.info(f"Fetching financial data for ticker: {ticker}")
+    logger.info("Fetching financial data for ticker: %s", ticker)
     
     try:
         # Get financial summary for the company
@@ -69,7 +101,7 @@ def company_financial_data(ticker):
         return jsonify({'success': True, 'data': data})
         
     except Exception as e:
-        logger.error(f"Error fetching financial data for {ticker}: {str(e)}")
+        logger.error("Error fetching financial data for %s: %s", ticker, e)
         return jsonify({'success': False, 'error': str(e)})
 
 @financial_bp.route('/profile/<ticker>', methods=['GET'])
@@ -77,7 +109,7 @@ def company_profile(ticker):
     """
     Get company profile by ticker symbol
     """
-    logger.info(f"Fetching company profile for ticker: {ticker}")
+    logger.info("Fetching company profile for ticker: %s", ticker)
     
     try:
         # Get company profile
@@ -89,7 +121,7 @@ def company_profile(ticker):
         return jsonify({'success': True, 'profile': profile})
         
     except Exception as e:
-        logger.error(f"Error fetching profile for {ticker}: {str(e)}")
+        logger.error("Error fetching profile for %s: %s", ticker, e)
         return jsonify({'success': False, 'error': str(e)})
 
 @financial_bp.route('/ratios/<ticker>', methods=['GET'])
@@ -97,7 +129,7 @@ def company_ratios(ticker):
     """
     Get financial ratios by ticker symbol
     """
-    logger.info(f"Fetching financial ratios for ticker: {ticker}")
+    logger.info("Fetching financial ratios for ticker: %s", ticker)
     
     try:
         # Get financial ratios
@@ -109,7 +141,7 @@ def company_ratios(ticker):
         return jsonify({'success': True, 'ratios': ratios})
         
     except Exception as e:
-        logger.error(f"Error fetching ratios for {ticker}: {str(e)}")
+        logger.error("Error fetching ratios for %s: %s", ticker, e)
         return jsonify({'success': False, 'error': str(e)})
 
 @financial_bp.route('/income/<ticker>', methods=['GET'])
@@ -120,7 +152,7 @@ def company_income(ticker):
     period = request.args.get('period', 'annual')
     limit = int(request.args.get('limit', 1))
     
-    logger.info(f"Fetching {period} income statement for ticker: {ticker}")
+    logger.info("Fetching %s income statement for ticker: %s", period, ticker)
     
     try:
         # Get income statement
@@ -132,7 +164,7 @@ def company_income(ticker):
         return jsonify({'success': True, 'income_statement': income})
         
     except Exception as e:
-        logger.error(f"Error fetching income statement for {ticker}: {str(e)}")
+        logger.error("Error fetching income statement for %s: %s", ticker, e)
         return jsonify({'success': False, 'error': str(e)})
 
 @financial_bp.route('/balance/<ticker>', methods=['GET'])
@@ -143,7 +175,7 @@ def company_balance(ticker):
     period = request.args.get('period', 'annual')
     limit = int(request.args.get('limit', 1))
     
-    logger.info(f"Fetching {period} balance sheet for ticker: {ticker}")
+    logger.info("Fetching %s balance sheet for ticker: %s", period, ticker)
     
     try:
         # Get balance sheet
@@ -155,5 +187,65 @@ def company_balance(ticker):
         return jsonify({'success': True, 'balance_sheet': balance})
         
     except Exception as e:
-        logger.error(f"Error fetching balance sheet for {ticker}: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}) 
\ No newline at end of file
+        logger.error("Error fetching balance sheet for %s: %s", ticker, e)
+        return jsonify({'success': False, 'error': str(e)})
+
+@financial_bp.route('/batch', methods=['POST'])
+def batch_financial_data():
+    """
+    Fetch several sections for several tickers in one request
+    
+    Expects JSON like {"tickers": ["AAPL", "MSFT"], "sections": ["profile", "ratios"]}
+    (sections defaults to all of them) and streams back newline-delimited JSON,
+    one line per (ticker, section) as soon as it completes.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+    
+    tickers = data.get('tickers') or []
+    sections = data.get('sections') or list(BATCH_SECTIONS)
+    
+    if not isinstance(tickers, list) or not tickers or not all(isinstance(ticker, str) for ticker in tickers):
+        return jsonify({'success': False, 'error': 'Please provide a list of tickers'}), 400
+    
+    if not isinstance(sections, list) or not all(isinstance(section, str) for section in sections):
+        return jsonify({'success': False, 'error': 'Sections must be a list of names'}), 400
+    
+    unknown = [section for section in sections if section not in BATCH_SECTIONS]
+    if unknown:
+        return jsonify({'success': False, 'error': f"Unknown sections: {', '.join(unknown)}"}), 400
+    
+    jobs = [(ticker, section) for ticker in tickers for section in sections]
+    if len(jobs) > MAX_BATCH_ITEMS:
+        return jsonify({'success': False, 'error': f"Batch too large: {len(jobs)} items (max {MAX_BATCH_ITEMS})"}), 400
+    
+    logger.info("Batch financial request received for %s tickers, %s sections", len(tickers), len(sections))
+    
+    def generate():
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            futures = {
+                pool.submit(BATCH_SECTIONS[section], ticker): (ticker, section)
+                for ticker, section in jobs
+            }
+            try:
+                for future in as_completed(futures):
+                    ticker, section = futures[future]
+                    line = {'ticker': ticker, 'section': section}
+                    try:
+                        result = future.result()
+                        if isinstance(result, dict) and "error" in result:
+                            line.update({'success': False, 'error': result["error"]})
+                        else:
+                            line.update({'success': True, 'data': result})
+                    except Exception as e:
+                        logger.error("Error fetching %s for %s in batch: %s", section, ticker, e)
+                        line.update({'success': False, 'error': str(e)})
+                    
+                    yield current_app.json.dumps(line) + "\n"
+            finally:
+                # Client went away or we are done; skip work that has not started
+                for future in futures:
+                    future.cancel()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
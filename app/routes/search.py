@@ -1,16 +1,52 @@
-import os
-import json
+import io
+import logging
+import orjson
 import pandas as pd
 import traceback
-from flask import Blueprint, render_template, request, jsonify, send_file, current_app
+from flask import Blueprint, Response, render_template, request, jsonify, send_file, current_app, stream_with_context
 from app.utils.maps_api import search_businesses, get_business_details
 from app.utils.financial_api import search_company_by_name, get_financial_summary
 from app.utils.openai_insights import generate_business_insights
 from werkzeug.utils import secure_filename
-import tempfile
 
 search_bp = Blueprint('search', __name__, url_prefix='/search')
 
+# Supported export formats: format -> (file extension, mimetype)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'feather': ('feather', 'application/vnd.apache.arrow.file')
+}
+
+# Rows written per chunk when streaming a CSV export
+CSV_CHUNK_ROWS = 10_000
+
+def _csv_chunks(df):
+    """
+    Yield a DataFrame as CSV, encoded as UTF-8 with a BOM, a chunk of rows at a time.
+    
+    The BOM keeps the utf-8-sig behaviour so Excel detects special characters.
+    """
+    yield '\ufeff'.encode('utf-8')
+    for start in range(0, max(len(df), 1), CSV_CHUNK_ROWS):
+        chunk = df.iloc[start:start + CSV_CHUNK_ROWS]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode('utf-8')
+
+def _columnar_frame(df):
+    """
+    Prepare a DataFrame for the Arrow-based (parquet/feather) writers.
+    
+    Arrow needs one type per column, so object columns that mix value types
+    (e.g. a rating of 'N/A' next to 4.5) are converted to strings.
+    """
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        if values.dropna().map(type).nunique() > 1:
+            df[column] = values.where(values.isna(), values.astype(str))
+    return df
+
 @search_bp.route('/', methods=['GET', 'POST'])
 def search():
     """Handle the search page and form submission."""
@@ -32,8 +68,8 @@ def search():
             # Log the result summary
             if businesses:
                 current_app.logger.info(f"Search successful: Found {len(businesses)} businesses")
-                business_names = [b.get('name') for b in businesses]
-                current_app.logger.info(f"Found businesses: {', '.join(business_names)}")
+                if current_app.logger.isEnabledFor(logging.DEBUG):
+                    current_app.logger.debug("Found businesses: %s", ', '.join(b.get('name') or '' for b in businesses))
             else:
                 current_app.logger.warning(f"No businesses found for query='{query}'")
                 
@@ -59,8 +95,10 @@ def business_details(place_id):
     """Get detailed information about a specific business."""
     current_app.logger.info(f"Business details requested for place_id: {place_id}")
     
+    force_refresh = request.args.get('forceRefresh', '').lower() in ('1', 'true')
+    
     try:
-        details = get_business_details(place_id)
+        details = get_business_details(place_id, force_refresh=force_refresh)
         
         # Try to fetch financial data if we have a business name
         financial_data = None
@@ -128,8 +166,8 @@ def export_data():
         businesses_json = request.form.get('businesses', '[]')
         current_app.logger.info(f"Export form request received: format={export_format}, data length={len(businesses_json)}")
         try:
-            businesses = json.loads(businesses_json)
-        except json.JSONDecodeError as json_error:
+            businesses = orjson.loads(businesses_json)
+        except orjson.JSONDecodeError as json_error:
             error_msg = f"Invalid JSON data provided: {str(json_error)}"
             current_app.logger.error(error_msg)
             current_app.logger.error(f"Received JSON: {businesses_json[:100]}...")  # Log first 100 chars
@@ -145,56 +183,43 @@ def export_data():
         # Create a DataFrame from the business data
         df = pd.DataFrame(businesses)
         
-        # Create a temporary file for the export
-        temp_dir = tempfile.gettempdir()
-        if export_format == 'excel':
-            temp_filename = os.path.join(temp_dir, "business_leads_export.xlsx")
-        else:
+        if export_format not in EXPORT_FORMATS:
             export_format = 'csv'  # Ensure format is set correctly
-            temp_filename = os.path.join(temp_dir, "business_leads_export.csv")
-        current_app.logger.info(f"Temp filename: {temp_filename}")
-            
-        if export_format == 'csv':
-            df.to_csv(temp_filename, index=False, encoding='utf-8-sig')  # Use utf-8-sig to handle special characters
-            mimetype = 'text/csv'
-            download_name = 'business_leads.csv'
-        else:  # excel
-            # Ensure openpyxl is available for Excel export
-            try:
-                current_app.logger.info("Attempting to create Excel file")
-                df.to_excel(temp_filename, index=False, engine='openpyxl')
-                mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                download_name = 'business_leads.xlsx'
-            except Exception as excel_error:
-                current_app.logger.error(f"Excel export error: {str(excel_error)}")
-                # Fallback to CSV if Excel export fails
-                export_format = 'csv'
-                temp_filename = os.path.join(temp_dir, "business_leads_export.csv")
-                current_app.logger.info(f"Falling back to CSV: {temp_filename}")
-                df.to_csv(temp_filename, index=False, encoding='utf-8-sig')
-                mimetype = 'text/csv'
-                download_name = 'business_leads.csv'
         
-        # Ensure the file exists before attempting to send it
-        if not os.path.exists(temp_filename):
-            error_msg = f"Generated file {temp_filename} not found"
-            current_app.logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
-        
-        file_size = os.path.getsize(temp_filename)
-        current_app.logger.info(f"File created successfully, size: {file_size} bytes")
+        # Binary formats are built in memory and sent from the buffer
+        if export_format != 'csv':
+            try:
+                current_app.logger.info(f"Attempting to create {export_format} file")
+                buffer = io.BytesIO()
+                if export_format == 'excel':
+                    # No constant_memory: pandas writes cells column by column,
+                    # and that mode drops writes to rows it has already flushed
+                    df.to_excel(buffer, index=False, engine='xlsxwriter')
+                elif export_format == 'parquet':
+                    _columnar_frame(df).to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+                else:  # feather
+                    _columnar_frame(df).to_feather(buffer)
+                
+                current_app.logger.info(f"File created successfully, size: {buffer.tell()} bytes")
+                buffer.seek(0)
+                
+                extension, mimetype = EXPORT_FORMATS[export_format]
+                return send_file(
+                    buffer,
+                    mimetype=mimetype,
+                    as_attachment=True,
+                    download_name=f'business_leads.{extension}'
+                )
+            except Exception as export_error:
+                current_app.logger.error(f"{export_format} export error: {str(export_error)}")
+                # Fallback to CSV if the export fails
+                current_app.logger.info("Falling back to CSV")
         
-        # Check if file is empty
-        if file_size == 0:
-            error_msg = "Generated file is empty"
-            current_app.logger.error(error_msg)
-            return jsonify({'success': False, 'error': error_msg})
-            
-        return send_file(
-            temp_filename,
-            mimetype=mimetype,
-            as_attachment=True,
-            download_name=download_name
+        # CSV is streamed to the client in chunks of rows
+        return Response(
+            stream_with_context(_csv_chunks(df)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=business_leads.csv'}
         )
     
     except Exception as e:
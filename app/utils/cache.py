@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import Future
+from functools import wraps
+from cachetools.keys import hashkey
+
+def ttl_cached(cache, key=hashkey):
+    """
+    Decorator that memoizes a function's results in the given cache
+    
+    Results that are error dicts (``{"error": ...}``) are returned to the
+    caller but never stored, so a failed lookup is retried on the next call.
+    
+    Args:
+        cache (cachetools.Cache): Cache instance to store results in, e.g. a TTLCache
+        key (callable): Builds the cache key from the call arguments
+        
+    Returns:
+        callable: The decorator
+    """
+    lock = threading.RLock()
+    
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            with lock:
+                try:
+                    return cache[cache_key]
+                except KeyError:
+                    pass
+            
+            result = func(*args, **kwargs)
+            
+            if not (isinstance(result, dict) and "error" in result):
+                with lock:
+                    cache[cache_key] = result
+            return result
+        
+        wrapper.cache = cache
+        return wrapper
+    
+    return decorator
+
+def singleflight(key=hashkey):
+    """
+    Decorator that collapses concurrent identical calls into a single call
+    
+    While a call for a given key is running, other threads calling with the
+    same key wait for it and receive its result (or exception) instead of
+    repeating the work. Place it above ttl_cached so the result is cached
+    before waiting callers are released.
+    
+    Args:
+        key (callable): Builds the in-flight key from the call arguments
+        
+    Returns:
+        callable: The decorator
+    """
+    def decorator(func):
+        inflight = {}
+        lock = threading.Lock()
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs)
+            with lock:
+                future = inflight.get(call_key)
+                is_leader = future is None
+                if is_leader:
+                    future = inflight[call_key] = Future()
+            
+            if not is_leader:
+                return future.result()
+            
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with lock:
+                    del inflight[call_key]
+        
+        return wrapper
+    
+    return decorator
@@ -1,7 +1,17 @@
 import os
+import orjson
 import requests
+import urllib3
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from app.utils.cache import singleflight, ttl_cached
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -9,10 +19,145 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Get API key from environment variables (we'll need to add this to .env)
+# Get API key from environment variables; create_app refuses to start without it
 FMP_API_KEY = os.environ.get('FMP_API_KEY')
 BASE_URL = "https://financialmodelingprep.com/api/v3"
 
+# Endpoint URL templates; query arguments are always passed through params=
+_ENDPOINTS = {
+    "search": BASE_URL + "/search",
+    "profile": BASE_URL + "/profile/{ticker}",
+    "ratios": BASE_URL + "/ratios-ttm/{ticker}",
+    "income": BASE_URL + "/income-statement/{ticker}",
+    "balance": BASE_URL + "/balance-sheet-statement/{ticker}"
+}
+
+# (connect, read) timeouts in seconds for every FMP request
+REQUEST_TIMEOUT = (3.05, 10)
+
+class _FMPRetry(Retry):
+    """
+    Retry policy for FMP requests
+    
+    FMP rate-limits with 429 + Retry-After. urllib3 already sleeps for the
+    advertised delay; this caps it so a rate-limited call fails fast instead
+    of parking a worker thread for the whole window.
+    """
+    RETRY_AFTER_MAX = 5
+    
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        if seconds is None:
+            return None
+        return min(seconds, self.RETRY_AFTER_MAX)
+
+# Shared session so connections to FMP are kept alive and reused across calls;
+# transient upstream failures on GETs are retried with exponential backoff
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=_FMPRetry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True
+    )
+))
+# Statement payloads compress very well; advertise every encoding urllib3 can
+# decode here (brotli is included when the brotli package is installed)
+_SESSION.headers.update({
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+    "User-Agent": "leadgen/1.0"
+})
+
+# Worker pool used to fetch the independent parts of a financial summary concurrently.
+# It is shared by all request threads, so it is sized for many summaries in flight
+# at once (each needs four workers) and stays within the session's connection pool.
+FMP_MAX_WORKERS = int(os.environ.get('FMP_MAX_WORKERS', 32))
+_POOL = ThreadPoolExecutor(max_workers=FMP_MAX_WORKERS, thread_name_prefix="fmp")
+
+# In-process caches; FMP profile, ratio and statement data changes at most daily
+_search_cache = TTLCache(maxsize=1024, ttl=600)
+_profile_cache = TTLCache(maxsize=2048, ttl=3600)
+_ratios_cache = TTLCache(maxsize=2048, ttl=3600)
+_income_cache = TTLCache(maxsize=2048, ttl=6 * 3600)
+_balance_cache = TTLCache(maxsize=2048, ttl=6 * 3600)
+
+# Last ETag/Last-Modified and payload per request, kept past the TTLs above so an
+# expired entry can be revalidated with a conditional GET instead of re-downloaded
+_validators = LRUCache(maxsize=4096)
+_validators_lock = threading.Lock()
+
+def _get_json(endpoint, params):
+    """
+    GET an FMP endpoint and decode its JSON body
+    
+    The response is streamed and its raw body read in one piece into orjson,
+    rather than requests first assembling it chunk by chunk into response.content.
+    When a previous response carried an ETag or Last-Modified header, the request
+    is made conditional and a 304 reuses the previously decoded payload.
+    
+    Args:
+        endpoint (str): Full endpoint URL
+        params (dict): Query parameters, including the API key
+        
+    Returns:
+        list | dict: Decoded JSON payload
+    """
+    validator_key = (endpoint, frozenset(params.items()))
+    with _validators_lock:
+        previous = _validators.get(validator_key)
+    
+    headers = {}
+    if previous:
+        etag, last_modified, _ = previous
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    
+    with _SESSION.get(endpoint, params=params, headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as response:
+        if response.status_code == 304 and previous:
+            return previous[2]
+        
+        response.raise_for_status()
+        try:
+            body = response.raw.read(decode_content=True)
+        except urllib3.exceptions.HTTPError as e:
+            # Reading raw skips requests' own exception wrapping, so do it here
+            raise requests.exceptions.RequestException(e, response=response)
+        payload = orjson.loads(body)
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with _validators_lock:
+                _validators[validator_key] = (etag, last_modified, payload)
+        
+        return payload
+
+def _search_key(name):
+    """Cache key for company searches, ignoring case and surrounding whitespace"""
+    return name.lower().strip()
+
+def _clamp_limit(limit):
+    """Number of statement periods to fetch; always at least one"""
+    return max(1, int(limit))
+
+def _statement_key(ticker, period="annual", limit=1):
+    """Cache key for statement fetchers, independent of positional/keyword call style"""
+    return (ticker, period, _clamp_limit(limit))
+
+def _unexpected_response(payload):
+    """Error message for an FMP response that isn't the expected list of records"""
+    if isinstance(payload, dict) and payload.get("Error Message"):
+        return payload["Error Message"]
+    return "Unexpected response from FMP"
+
+@singleflight(key=_search_key)
+@ttl_cached(_search_cache, key=_search_key)
 def search_company_by_name(name):
     """
     Search for a company by name to get its ticker symbol
@@ -23,25 +168,24 @@ def search_company_by_name(name):
     Returns:
         list: List of matching companies with their details
     """
-    logger.info(f"Searching for company with name: {name}")
-    
-    if not FMP_API_KEY:
-        logger.error("FMP_API_KEY is missing from environment variables")
-        return {"error": "API key not configured"}
+    logger.info("Searching for company with name: %s", name)
     
     try:
-        endpoint = f"{BASE_URL}/search?query={name}&limit=10&apikey={FMP_API_KEY}"
-        response = requests.get(endpoint)
-        response.raise_for_status()
-        
-        companies = response.json()
-        logger.info(f"Found {len(companies)} companies matching '{name}'")
+        endpoint = _ENDPOINTS["search"]
+        params = {"query": name, "limit": 10, "apikey": FMP_API_KEY}
+        companies = _get_json(endpoint, params)
+        if not isinstance(companies, list):
+            logger.error("Unexpected search response for company '%s': %s", name, companies)
+            return {"error": _unexpected_response(companies)}
+        logger.info("Found %s companies matching '%s'", len(companies), name)
         return companies
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error searching for company '{name}': {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.error("Error searching for company '%s': %s", name, e)
         return {"error": str(e)}
 
+@singleflight()
+@ttl_cached(_profile_cache)
 def get_company_profile(ticker):
     """
     Get detailed profile information for a company by ticker symbol
@@ -52,28 +196,26 @@ def get_company_profile(ticker):
     Returns:
         dict: Company profile data
     """
-    logger.info(f"Getting profile for company with ticker: {ticker}")
-    
-    if not FMP_API_KEY:
-        logger.error("FMP_API_KEY is missing from environment variables")
-        return {"error": "API key not configured"}
+    logger.info("Getting profile for company with ticker: %s", ticker)
     
     try:
-        endpoint = f"{BASE_URL}/profile/{ticker}?apikey={FMP_API_KEY}"
-        response = requests.get(endpoint)
-        response.raise_for_status()
-        
-        profiles = response.json()
+        endpoint = _ENDPOINTS["profile"].format(ticker=quote(ticker, safe=""))
+        profiles = _get_json(endpoint, {"apikey": FMP_API_KEY})
+        if profiles and not isinstance(profiles, list):
+            logger.error("Unexpected profile response for ticker '%s': %s", ticker, profiles)
+            return {"error": _unexpected_response(profiles)}
         if not profiles:
-            logger.warning(f"No profile found for ticker '{ticker}'")
+            logger.warning("No profile found for ticker '%s'", ticker)
             return {"error": "Company not found"}
         
         return profiles[0]  # Return the first profile
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error getting profile for ticker '{ticker}': {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.error("Error getting profile for ticker '%s': %s", ticker, e)
         return {"error": str(e)}
 
+@singleflight()
+@ttl_cached(_ratios_cache)
 def get_financial_ratios(ticker):
     """
     Get key financial ratios for a company
@@ -84,28 +226,26 @@ def get_financial_ratios(ticker):
     Returns:
         dict: Financial ratios data
     """
-    logger.info(f"Getting financial ratios for company with ticker: {ticker}")
-    
-    if not FMP_API_KEY:
-        logger.error("FMP_API_KEY is missing from environment variables")
-        return {"error": "API key not configured"}
+    logger.info("Getting financial ratios for company with ticker: %s", ticker)
     
     try:
-        endpoint = f"{BASE_URL}/ratios-ttm/{ticker}?apikey={FMP_API_KEY}"
-        response = requests.get(endpoint)
-        response.raise_for_status()
-        
-        ratios = response.json()
+        endpoint = _ENDPOINTS["ratios"].format(ticker=quote(ticker, safe=""))
+        ratios = _get_json(endpoint, {"apikey": FMP_API_KEY})
+        if ratios and not isinstance(ratios, list):
+            logger.error("Unexpected financial ratios response for ticker '%s': %s", ticker, ratios)
+            return {"error": _unexpected_response(ratios)}
         if not ratios:
-            logger.warning(f"No financial ratios found for ticker '{ticker}'")
+            logger.warning("No financial ratios found for ticker '%s'", ticker)
             return {"error": "Financial ratios not found"}
         
         return ratios[0]  # Return the first set of ratios
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error getting financial ratios for ticker '{ticker}': {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.error("Error getting financial ratios for ticker '%s': %s", ticker, e)
         return {"error": str(e)}
 
+@singleflight(key=_statement_key)
+@ttl_cached(_income_cache, key=_statement_key)
 def get_income_statement(ticker, period="annual", limit=1):
     """
     Get income statement for a company
@@ -118,28 +258,30 @@ def get_income_statement(ticker, period="annual", limit=1):
     Returns:
         list: Income statement data
     """
-    logger.info(f"Getting {period} income statement for company with ticker: {ticker}")
+    logger.info("Getting %s income statement for company with ticker: %s", period, ticker)
     
-    if not FMP_API_KEY:
-        logger.error("FMP_API_KEY is missing from environment variables")
-        return {"error": "API key not configured"}
+    limit = _clamp_limit(limit)
     
     try:
-        endpoint = f"{BASE_URL}/income-statement/{ticker}?period={period}&limit={limit}&apikey={FMP_API_KEY}"
-        response = requests.get(endpoint)
-        response.raise_for_status()
-        
-        statements = response.json()
+        endpoint = _ENDPOINTS["income"].format(ticker=quote(ticker, safe=""))
+        params = {"period": period, "limit": limit, "apikey": FMP_API_KEY}
+        statements = _get_json(endpoint, params)
+        if statements and not isinstance(statements, list):
+            logger.error("Unexpected income statement response for ticker '%s': %s", ticker, statements)
+            return {"error": _unexpected_response(statements)}
         if not statements:
-            logger.warning(f"No income statement found for ticker '{ticker}'")
+            logger.warning("No income statement found for ticker '%s'", ticker)
             return {"error": "Income statement not found"}
         
-        return statements
+        # Don't keep (or cache) more periods than were asked for
+        return statements[:limit]
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error getting income statement for ticker '{ticker}': {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.error("Error getting income statement for ticker '%s': %s", ticker, e)
         return {"error": str(e)}
 
+@singleflight(key=_statement_key)
+@ttl_cached(_balance_cache, key=_statement_key)
 def get_balance_sheet(ticker, period="annual", limit=1):
     """
     Get balance sheet for a company
@@ -152,26 +294,26 @@ def get_balance_sheet(ticker, period="annual", limit=1):
     Returns:
         list: Balance sheet data
     """
-    logger.info(f"Getting {period} balance sheet for company with ticker: {ticker}")
+    logger.info("Getting %s balance sheet for company with ticker: %s", period, ticker)
     
-    if not FMP_API_KEY:
-        logger.error("FMP_API_KEY is missing from environment variables")
-        return {"error": "API key not configured"}
+    limit = _clamp_limit(limit)
     
     try:
-        endpoint = f"{BASE_URL}/balance-sheet-statement/{ticker}?period={period}&limit={limit}&apikey={FMP_API_KEY}"
-        response = requests.get(endpoint)
-        response.raise_for_status()
-        
-        statements = response.json()
+        endpoint = _ENDPOINTS["balance"].format(ticker=quote(ticker, safe=""))
+        params = {"period": period, "limit": limit, "apikey": FMP_API_KEY}
+        statements = _get_json(endpoint, params)
+        if statements and not isinstance(statements, list):
+            logger.error("Unexpected balance sheet response for ticker '%s': %s", ticker, statements)
+            return {"error": _unexpected_response(statements)}
         if not statements:
-            logger.warning(f"No balance sheet found for ticker '{ticker}'")
+            logger.warning("No balance sheet found for ticker '%s'", ticker)
             return {"error": "Balance sheet not found"}
         
-        return statements
+        # Don't keep (or cache) more periods than were asked for
+        return statements[:limit]
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error getting balance sheet for ticker '{ticker}': {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.error("Error getting balance sheet for ticker '%s': %s", ticker, e)
         return {"error": str(e)}
 
 def get_financial_summary(ticker):
@@ -184,23 +326,32 @@ def get_financial_summary(ticker):
     Returns:
         dict: Combined financial data
     """
-    logger.info(f"Getting financial summary for company with ticker: {ticker}")
+    logger.info("Getting financial summary for company with ticker: %s", ticker)
+    
+    # Fire all four requests at once; they are independent of each other
+    f_profile = _POOL.submit(get_company_profile, ticker)
+    f_ratios = _POOL.submit(get_financial_ratios, ticker)
+    f_income = _POOL.submit(get_income_statement, ticker, limit=1)
+    f_balance = _POOL.submit(get_balance_sheet, ticker, limit=1)
     
     # Get company profile
-    profile = get_company_profile(ticker)
+    profile = f_profile.result()
     if "error" in profile:
+        # Drop whatever has not started yet; nothing else is needed
+        for future in (f_ratios, f_income, f_balance):
+            future.cancel()
         return profile
     
     # Get financial ratios
-    ratios = get_financial_ratios(ticker)
+    ratios = f_ratios.result()
     
     # Get latest income statement
-    income = get_income_statement(ticker)
+    income = f_income.result()
     if isinstance(income, list) and income:
         income = income[0]
     
     # Get latest balance sheet
-    balance = get_balance_sheet(ticker)
+    balance = f_balance.result()
     if isinstance(balance, list) and balance:
         balance = balance[0]
     
@@ -0,0 +1,40 @@
+import decimal
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+def _default(obj):
+    """Serialize the few types orjson does not handle natively"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson
+    
+    Used for jsonify(), request.get_json() and current_app.json, so API
+    responses are encoded by orjson instead of the stdlib json module.
+    Calls that pass json module arguments (Flask's session serializer uses
+    object_hook and separators, for example) fall back to the default
+    stdlib-based provider, since orjson has no equivalent for them.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype="application/json"
+        )
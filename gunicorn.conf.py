@@ -0,0 +1,14 @@
+import os
+import multiprocessing
+
+# Production server settings; gunicorn picks this file up automatically:
+#   gunicorn app:app
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# The app is network-I/O bound, so each worker serves many requests on threads
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+
+# Upstream calls have their own timeouts; this only catches truly stuck workers
+timeout = 60
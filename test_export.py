@@ -0,0 +1,39 @@
+import io
+import os
+import pandas as pd
+
+os.environ.setdefault('FMP_API_KEY', 'test')
+os.environ.setdefault('GITHUB_TOKEN', 'test')
+
+from app import create_app
+
+# Several rows and columns, so a writer that drops cells (or whole rows) shows up
+BUSINESSES = [
+    {
+        'place_id': f'place-{i}',
+        'name': f'Business {i}',
+        'address': f'{i} Main St',
+        'phone': f'555-000{i}',
+        'website': f'https://business{i}.example',
+        'rating': 4.0 + i / 10,
+        'email': f'info@business{i}.example',
+        'ceo_name': f'Owner {i}'
+    }
+    for i in range(5)
+]
+
+def test_excel_export_round_trip():
+    """Export businesses as Excel and check every cell survives being read back"""
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    
+    response = app.test_client().post('/search/export', json={'format': 'excel', 'businesses': BUSINESSES})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    
+    exported = pd.read_excel(io.BytesIO(response.data))
+    pd.testing.assert_frame_equal(exported, pd.DataFrame(BUSINESSES), check_dtype=False)
+
+if __name__ == '__main__':
+    test_excel_export_round_trip()
+    print("Excel export round trip OK")